@@ -1,10 +1,19 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import httpx
-import json
+import orjson
+import aiofiles
+import ahocorasick
+import uvicorn
+import zstandard as zstd
+import asyncio
+import functools
+import hashlib
 import os
-from typing import Optional
+import sys
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 from pathlib import Path
 import uuid
 
@@ -12,8 +21,92 @@ app = FastAPI()
 
 OLLAMA_BASE_URL = "http://localhost:11434"
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:3b-instruct-q4_K_M")
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+if WEB_CONCURRENCY > OLLAMA_NUM_PARALLEL:
+    raise RuntimeError(f"WEB_CONCURRENCY ({WEB_CONCURRENCY}) must not exceed OLLAMA_NUM_PARALLEL ({OLLAMA_NUM_PARALLEL})")
 RESUMES_DIR = Path("./data/resumes")
 RESUMES_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR = RESUMES_DIR / "cache"
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_MAX_ENTRIES = 256
+CACHE_DIR_MAX_ENTRIES = 4096
+CACHE_PRUNE_INTERVAL = 64
+CACHE_VERSION = 1
+HEALTH_POLL_INTERVAL = 5.0
+MAX_RESUME_CHARS = 8000
+TASK_TOKENS_PER_SKILL = 120
+SKILLS_FILE = Path(__file__).parent / "data" / "skills.json"
+SKILL_LLM_FALLBACK = os.getenv("SKILL_LLM_FALLBACK", "1") == "1"
+SKILL_LLM_FALLBACK_MIN_MATCHES = 3
+
+CLIENT: Optional[httpx.AsyncClient] = None
+OLLAMA_SEMAPHORE: Optional[asyncio.Semaphore] = None
+SKILL_AUTOMATON: Optional[ahocorasick.Automaton] = None
+COMPRESSOR = zstd.ZstdCompressor(level=3)
+DECOMPRESSOR = zstd.ZstdDecompressor()
+_HEALTH = {"status": "degraded", "ollama": "unavailable"}
+_health_task: Optional[asyncio.Task] = None
+_memory_cache: "OrderedDict[str, dict]" = OrderedDict()
+_cache_writes = 0
+_inflight: Dict[str, asyncio.Task] = {}
+
+ANALYZE_PROMPT = """Analyze this resume and extract information. Return ONLY valid JSON, no other text.
+
+Resume:
+{resume}
+
+Return JSON in this exact format:
+{{
+  "skills": ["skill1", "skill2", ...],
+  "years_experience": "X years" or null,
+  "role_suggestions": ["role1", "role2", ...]
+}}"""
+
+EXTRACT_SKILLS_PROMPT = """Analyze this resume and extract skills. Return ONLY valid JSON.
+
+Resume:
+{resume}
+
+Return JSON:
+{{
+  "skills": ["skill1", "skill2", ...]
+}}"""
+
+SKILL_GAP_PROMPT = """Analyze this resume, extract the candidate's skills, then compare them against the target role requirements and identify missing skills. Return ONLY valid JSON.
+
+Resume:
+{resume}
+
+Target Role: {target_role}
+
+Return JSON:
+{{
+  "skills": ["skill1", "skill2", ...],
+  "missing_skills": ["skill1", "skill2", ...]
+}}"""
+
+WEEKLY_TASKS_PROMPT = """Generate 5-7 practical weekly learning tasks for each missing skill. Return ONLY valid JSON.
+
+Missing Skills: {missing_skills}
+
+Return JSON:
+{{
+  "weekly_tasks": [
+    {{"skill": "skill1", "tasks": ["task1", "task2", "task3", "task4", "task5", "task6", "task7"]}},
+    {{"skill": "skill2", "tasks": ["task1", "task2", "task3", "task4", "task5"]}}
+  ]
+}}"""
+
+_TASK_TEMPLATES = (
+    "Study {0} fundamentals and core concepts",
+    "Complete online {0} tutorial or course",
+    "Practice {0} with hands-on exercises",
+    "Build a small project using {0}",
+    "Read {0} documentation and best practices",
+    "Join {0} community and participate in discussions",
+    "Create a portfolio piece showcasing {0}"
+)
 
 class SkillAnalysisRequest(BaseModel):
     resume_text: Optional[str] = None
@@ -31,17 +124,266 @@ class WeeklyLearningTaskRequest(BaseModel):
     resume_id: Optional[str] = None
     missing_skills: Optional[list] = None
 
-@app.get("/health")
-async def health():
+class SkillAnalysis(BaseModel):
+    skills: List[str]
+    years_experience: Optional[str]
+    role_suggestions: List[str]
+
+class ExtractedSkills(BaseModel):
+    skills: List[str]
+
+class SkillGap(BaseModel):
+    skills: List[str]
+    missing_skills: List[str]
+
+class SkillTasks(BaseModel):
+    skill: str
+    tasks: List[str]
+
+class WeeklyTasks(BaseModel):
+    weekly_tasks: List[SkillTasks]
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+@app.on_event("startup")
+async def startup():
+    global CLIENT, OLLAMA_SEMAPHORE, SKILL_AUTOMATON, _health_task
+    OLLAMA_SEMAPHORE = asyncio.Semaphore(OLLAMA_NUM_PARALLEL // WEB_CONCURRENCY)
+    SKILL_AUTOMATON = _build_skill_automaton()
+    await asyncio.to_thread(_prune_cache_dir)
+    CLIENT = httpx.AsyncClient(
+        base_url=OLLAMA_BASE_URL,
+        timeout=300.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    _health_task = asyncio.create_task(_health_poll())
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _health_task is not None:
+        _health_task.cancel()
+        try:
+            await _health_task
+        except asyncio.CancelledError:
+            pass
+    if CLIENT is not None:
+        await CLIENT.aclose()
+
+async def _check_ollama() -> dict:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5.0)
-            if response.status_code == 200:
-                return {"status": "healthy", "ollama": "connected"}
-            else:
-                return {"status": "degraded", "ollama": "unavailable"}
+        response = await CLIENT.get("/api/tags", timeout=5.0)
+        if response.status_code == 200:
+            return {"status": "healthy", "ollama": "connected"}
     except Exception:
-        return {"status": "degraded", "ollama": "unavailable"}
+        pass
+    return {"status": "degraded", "ollama": "unavailable"}
+
+async def _health_poll():
+    global _HEALTH
+    while True:
+        _HEALTH = await _check_ollama()
+        await asyncio.sleep(HEALTH_POLL_INTERVAL)
+
+async def _ollama_generate(payload: dict) -> Tuple[int, str]:
+    async with OLLAMA_SEMAPHORE:
+        async with CLIENT.stream(
+            "POST",
+            "/api/generate",
+            content=orjson.dumps(payload),
+            headers={"content-type": "application/json"}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return response.status_code, response.text
+            
+            chunks = []
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if not isinstance(chunk, dict):
+                    raise ValueError("Ollama stream line is not a JSON object")
+                if "error" in chunk:
+                    return 500, chunk["error"]
+                chunks.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    break
+            return 200, "".join(chunks).strip()
+
+@functools.lru_cache(maxsize=None)
+def _json_schema(model: Type[BaseModel]) -> dict:
+    return model.model_json_schema()
+
+async def _ollama_generate_json(
+    prompt: str,
+    model: Type[ResponseModel],
+    num_predict: int,
+    temperature: float = 0.3
+) -> ResponseModel:
+    try:
+        status_code, text = await _ollama_generate({
+            "model": OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": True,
+            "format": _json_schema(model),
+            "options": {
+                "temperature": temperature,
+                "num_predict": num_predict
+            }
+        })
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Request timeout. Ollama may be slow or unresponsive.")
+    except httpx.ConnectError:
+        raise HTTPException(status_code=503, detail="Cannot connect to Ollama service. Ensure Ollama is running at http://localhost:11434")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Ollama connection error: {str(e)}")
+    except ValueError:
+        raise HTTPException(status_code=502, detail="Ollama returned a malformed response stream")
+    
+    if status_code != 200:
+        raise HTTPException(status_code=500, detail=f"Ollama service error: {text}")
+    
+    try:
+        return model.model_validate_json(text)
+    except ValidationError:
+        raise HTTPException(status_code=502, detail="Ollama response did not match the expected JSON schema")
+
+def _cache_key(resume_text: str, endpoint: str, params: dict) -> str:
+    params = {**params, "cache_version": CACHE_VERSION}
+    return hashlib.blake2b(
+        resume_text.encode() + b"\0" + endpoint.encode() + b"\0" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+
+def _remember(key: str, value: dict) -> None:
+    _memory_cache[key] = value
+    _memory_cache.move_to_end(key)
+    if len(_memory_cache) > CACHE_MAX_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+def _read_cache_file(key: str) -> Optional[dict]:
+    cache_path = CACHE_DIR / f"{key}.json"
+    try:
+        value = orjson.loads(cache_path.read_bytes())
+        os.utime(cache_path)
+    except (OSError, ValueError):
+        return None
+    return value
+
+def _write_cache_file(key: str, value: dict) -> bool:
+    cache_path = CACHE_DIR / f"{key}.json"
+    tmp_path = CACHE_DIR / f"{key}.{uuid.uuid4().hex}.tmp"
+    try:
+        tmp_path.write_bytes(orjson.dumps(value))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        return False
+    return True
+
+async def _cache_get(key: str) -> Optional[dict]:
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+    value = await asyncio.to_thread(_read_cache_file, key)
+    if value is None:
+        return None
+    _remember(key, value)
+    return value
+
+async def _cache_put(key: str, value: dict) -> None:
+    global _cache_writes
+    _remember(key, value)
+    if not await asyncio.to_thread(_write_cache_file, key, value):
+        return
+    _cache_writes += 1
+    if _cache_writes % CACHE_PRUNE_INTERVAL == 0:
+        await asyncio.to_thread(_prune_cache_dir)
+
+def _prune_cache_dir() -> None:
+    entries = []
+    for cache_path in CACHE_DIR.glob("*.json"):
+        try:
+            entries.append((cache_path.stat().st_mtime_ns, cache_path))
+        except OSError:
+            continue
+    if len(entries) <= CACHE_DIR_MAX_ENTRIES:
+        return
+    entries.sort()
+    for _, cache_path in entries[:len(entries) - CACHE_DIR_MAX_ENTRIES]:
+        cache_path.unlink(missing_ok=True)
+
+async def _cached_or_compute(key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+    cached = await _cache_get(key)
+    if cached is not None:
+        return cached
+    return await compute()
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_cached_or_compute(key, compute))
+        _inflight[key] = task
+        
+        def finished(done: asyncio.Task) -> None:
+            del _inflight[key]
+            if not done.cancelled():
+                done.exception()
+        
+        task.add_done_callback(finished)
+    return await asyncio.shield(task)
+
+def _task_num_predict(missing_skills: list) -> int:
+    return max(200, min(1500, TASK_TOKENS_PER_SKILL * len(missing_skills)))
+
+def _fallback_tasks(missing_skills: list) -> list:
+    return [
+        {"skill": skill, "tasks": [template.format(skill) for template in _TASK_TEMPLATES]}
+        for skill in missing_skills
+    ]
+
+def _build_skill_automaton() -> ahocorasick.Automaton:
+    automaton = ahocorasick.Automaton()
+    for skill in orjson.loads(SKILLS_FILE.read_bytes()):
+        word = skill.lower()
+        automaton.add_word(word, (len(word), skill))
+    automaton.make_automaton()
+    return automaton
+
+def _match_skills(resume_text: str) -> list:
+    text = resume_text.lower()
+    skills = set()
+    for end, (length, skill) in SKILL_AUTOMATON.iter(text):
+        start = end - length + 1
+        if start > 0 and text[start - 1].isalnum():
+            continue
+        if end + 1 < len(text) and text[end + 1].isalnum():
+            continue
+        skills.add(skill)
+    return sorted(skills)
+
+@functools.lru_cache(maxsize=1024)
+def _load_resume(file_path: Path, mtime_ns: int) -> bytes:
+    data = file_path.read_bytes()
+    if file_path.suffix == ".zst":
+        return data
+    return COMPRESSOR.compress(data)
+
+def _read_resume(resume_id: str) -> str:
+    for suffix in (".zst", ".txt"):
+        file_path = RESUMES_DIR / f"{resume_id}{suffix}"
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            continue
+        return DECOMPRESSOR.decompress(_load_resume(file_path, mtime_ns)).decode("utf-8")
+    raise HTTPException(status_code=404, detail="Resume not found")
+
+@app.get("/health")
+async def health():
+    return _HEALTH
 
 @app.post("/upload_resume")
 async def upload_resume(
@@ -51,24 +393,30 @@ async def upload_resume(
     try:
         if file:
             content = await file.read()
-            resume_text = content.decode('utf-8')
+            content.decode('utf-8')
             filename = file.filename or "resume.txt"
         elif text:
-            resume_text = text
+            content = text.encode('utf-8')
             filename = "resume.txt"
         else:
             raise HTTPException(status_code=400, detail="Either file or text must be provided")
         
-        resume_id = str(uuid.uuid4())
-        file_path = RESUMES_DIR / f"{resume_id}.txt"
+        resume_id = uuid.uuid4().hex
+        file_path = RESUMES_DIR / f"{resume_id}.zst"
+        tmp_path = RESUMES_DIR / f"{resume_id}.zst.tmp"
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(resume_text)
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                await f.write(COMPRESSOR.compress(content))
+            os.replace(tmp_path, file_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
         
         return {
             "resume_id": resume_id,
             "filename": filename,
-            "size": len(resume_text),
+            "size": len(content),
             "message": "Resume uploaded successfully",
             "path": str(file_path)
         }
@@ -80,158 +428,53 @@ async def analyze_skills(request: SkillAnalysisRequest):
     resume_text = None
     
     if request.resume_id:
-        file_path = RESUMES_DIR / f"{request.resume_id}.txt"
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="Resume not found")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            resume_text = f.read()
+        resume_text = _read_resume(request.resume_id)
     elif request.resume_text:
         resume_text = request.resume_text
     else:
         raise HTTPException(status_code=400, detail="Either resume_text or resume_id is required")
     
-    prompt = f"""Analyze this resume and extract information. Return ONLY valid JSON, no other text.
-
-Resume:
-{resume_text}
-
-Return JSON in this exact format:
-{{
-  "skills": ["skill1", "skill2", ...],
-  "years_experience": "X years" or null,
-  "role_suggestions": ["role1", "role2", ...]
-}}"""
+    cache_key = _cache_key(resume_text, "analyze_skills", {"model": OLLAMA_MODEL})
+    
+    async def analyze() -> dict:
+        prompt = ANALYZE_PROMPT.format(resume=resume_text[:MAX_RESUME_CHARS])
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 800
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                error_detail = response.text if hasattr(response, 'text') else "Ollama service error"
-                raise HTTPException(status_code=500, detail=f"Ollama service error: {error_detail}")
-            
-            result = response.json()
-            analysis_text = result.get("response", "").strip()
-            
-            try:
-                analysis_text = analysis_text.strip()
-                
-                if analysis_text.startswith("```json"):
-                    analysis_text = analysis_text[7:]
-                if analysis_text.startswith("```"):
-                    analysis_text = analysis_text[3:]
-                if analysis_text.endswith("```"):
-                    analysis_text = analysis_text[:-3]
-                analysis_text = analysis_text.strip()
-                
-                first_brace = analysis_text.find('{')
-                last_brace = analysis_text.rfind('}')
-                
-                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                    json_str = analysis_text[first_brace:last_brace + 1]
-                else:
-                    json_str = analysis_text
-                
-                analysis_json = json.loads(json_str)
-                
-                if not isinstance(analysis_json, dict):
-                    raise ValueError("Response is not a JSON object")
-                
-                result_data = {
-                    "skills": analysis_json.get("skills", []),
-                    "years_experience": analysis_json.get("years_experience"),
-                    "role_suggestions": analysis_json.get("role_suggestions", [])
-                }
-                
-                return result_data
-            except json.JSONDecodeError as e:
-                return {
-                    "skills": [],
-                    "years_experience": None,
-                    "role_suggestions": [],
-                    "error": "Failed to parse LLM response as JSON",
-                    "raw_response": analysis_text[:500]
-                }
-    except httpx.TimeoutException:
-        raise HTTPException(status_code=504, detail="Request timeout. Ollama may be slow or unresponsive.")
-    except httpx.ConnectError:
-        raise HTTPException(status_code=503, detail="Cannot connect to Ollama service. Ensure Ollama is running at http://localhost:11434")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"Ollama connection error: {str(e)}")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+        analysis = await _ollama_generate_json(prompt, SkillAnalysis, num_predict=800)
+        result_data = analysis.model_dump()
+        await _cache_put(cache_key, result_data)
+        return result_data
+    
+    return await _single_flight(cache_key, analyze)
 
 async def _extract_skills_from_resume(resume_text: str) -> dict:
-    prompt = f"""Analyze this resume and extract skills. Return ONLY valid JSON.
-
-Resume:
-{resume_text}
-
-Return JSON:
-{{
-  "skills": ["skill1", "skill2", ...]
-}}"""
+    matched_skills = _match_skills(resume_text)
+    if len(matched_skills) >= SKILL_LLM_FALLBACK_MIN_MATCHES or not SKILL_LLM_FALLBACK:
+        return {"skills": matched_skills}
+    
+    cache_key = _cache_key(resume_text, "extract_skills", {"model": OLLAMA_MODEL})
+    
+    async def extract() -> dict:
+        prompt = EXTRACT_SKILLS_PROMPT.format(resume=resume_text[:MAX_RESUME_CHARS])
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 600
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                return {"skills": []}
-            
-            result = response.json()
-            analysis_text = result.get("response", "").strip()
-            
-            try:
-                first_brace = analysis_text.find('{')
-                last_brace = analysis_text.rfind('}')
-                
-                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                    json_str = analysis_text[first_brace:last_brace + 1]
-                else:
-                    json_str = analysis_text
-                
-                analysis_json = json.loads(json_str)
-                return {"skills": analysis_json.get("skills", [])}
-            except Exception:
-                return {"skills": []}
-    except Exception:
-        return {"skills": []}
+        try:
+            extracted = await _ollama_generate_json(prompt, ExtractedSkills, num_predict=300)
+        except HTTPException:
+            return {"skills": matched_skills}
+        if not extracted.skills:
+            return {"skills": matched_skills}
+        
+        result_data = extracted.model_dump()
+        await _cache_put(cache_key, result_data)
+        return result_data
+    
+    return await _single_flight(cache_key, extract)
 
 @app.post("/skill_gap_analysis")
 async def skill_gap_analysis(request: SkillGapAnalysisRequest):
     resume_text = None
     
     if request.resume_id:
-        file_path = RESUMES_DIR / f"{request.resume_id}.txt"
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="Resume not found")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            resume_text = f.read()
+        resume_text = _read_resume(request.resume_id)
     elif request.resume_text:
         resume_text = request.resume_text
     else:
@@ -241,130 +484,42 @@ async def skill_gap_analysis(request: SkillGapAnalysisRequest):
     if not target_role:
         raise HTTPException(status_code=400, detail="Either target_role or job_description is required")
     
-    extracted_skills_data = await _extract_skills_from_resume(resume_text)
-    extracted_skills = extracted_skills_data.get("skills", [])
+    cache_key = _cache_key(resume_text, "skill_gap_analysis", {"model": OLLAMA_MODEL, "target_role": target_role})
     
-    prompt = f"""Compare the candidate's skills against the target role requirements and identify missing skills.
+    async def analyze_gap() -> dict:
+        prompt = SKILL_GAP_PROMPT.format(resume=resume_text[:MAX_RESUME_CHARS], target_role=target_role)
 
-Candidate's Skills: {', '.join(extracted_skills) if extracted_skills else 'None listed'}
-Target Role: {target_role}
-
-Return ONLY valid JSON:
-{{
-  "missing_skills": ["skill1", "skill2", ...]
-}}"""
+        gap = await _ollama_generate_json(prompt, SkillGap, num_predict=500)
+        extracted_skills = gap.skills
+        missing_skills = gap.missing_skills
+        
+        weekly_tasks = []
+        if missing_skills:
+            task_prompt = WEEKLY_TASKS_PROMPT.format(missing_skills=', '.join(missing_skills))
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 600
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Ollama service error")
-            
-            result = response.json()
-            analysis_text = result.get("response", "").strip()
-            
-            missing_skills = []
             try:
-                first_brace = analysis_text.find('{')
-                last_brace = analysis_text.rfind('}')
-                
-                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                    json_str = analysis_text[first_brace:last_brace + 1]
-                else:
-                    json_str = analysis_text
-                
-                gap_json = json.loads(json_str)
-                missing_skills = gap_json.get("missing_skills", [])
-            except Exception:
-                missing_skills = []
-            
-            weekly_tasks = []
-            if missing_skills:
-                task_prompt = f"""Generate 5-7 practical weekly learning tasks for each missing skill. Return ONLY valid JSON.
-
-Missing Skills: {', '.join(missing_skills)}
-
-Return JSON:
-{{
-  "weekly_tasks": [
-    {{"skill": "skill1", "tasks": ["task1", "task2", "task3", "task4", "task5", "task6", "task7"]}},
-    {{"skill": "skill2", "tasks": ["task1", "task2", "task3", "task4", "task5"]}}
-  ]
-}}"""
-
-                task_response = await client.post(
-                    f"{OLLAMA_BASE_URL}/api/generate",
-                    json={
-                        "model": OLLAMA_MODEL,
-                        "prompt": task_prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.5,
-                            "num_predict": 1500
-                        }
-                    }
-                )
-                
-                if task_response.status_code == 200:
-                    task_result = task_response.json()
-                    task_text = task_result.get("response", "").strip()
-                    
-                    try:
-                        first_brace = task_text.find('{')
-                        last_brace = task_text.rfind('}')
-                        
-                        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                            json_str = task_text[first_brace:last_brace + 1]
-                        else:
-                            json_str = task_text
-                        
-                        task_json = json.loads(json_str)
-                        weekly_tasks = task_json.get("weekly_tasks", [])
-                    except Exception:
-                        pass
-                
-                if not weekly_tasks:
-                    for skill in missing_skills:
-                        weekly_tasks.append({
-                            "skill": skill,
-                            "tasks": [
-                                f"Study {skill} fundamentals and core concepts",
-                                f"Complete online {skill} tutorial or course",
-                                f"Practice {skill} with hands-on exercises",
-                                f"Build a small project using {skill}",
-                                f"Read {skill} documentation and best practices",
-                                f"Join {skill} community and participate in discussions",
-                                f"Create a portfolio piece showcasing {skill}"
-                            ][:7]
-                        })
+                tasks = await _ollama_generate_json(task_prompt, WeeklyTasks, num_predict=_task_num_predict(missing_skills), temperature=0.5)
+                weekly_tasks = tasks.model_dump()["weekly_tasks"]
+            except HTTPException as e:
+                if e.status_code != 502:
+                    raise
             
-            return {
-                "extracted_skills": extracted_skills,
-                "missing_skills": missing_skills,
-                "weekly_tasks": weekly_tasks
-            }
-    except httpx.TimeoutException:
-        raise HTTPException(status_code=504, detail="Request timeout. Ollama may be slow or unresponsive.")
-    except httpx.ConnectError:
-        raise HTTPException(status_code=503, detail="Cannot connect to Ollama service. Ensure Ollama is running at http://localhost:11434")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"Ollama connection error: {str(e)}")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+            if not weekly_tasks:
+                return {
+                    "extracted_skills": extracted_skills,
+                    "missing_skills": missing_skills,
+                    "weekly_tasks": _fallback_tasks(missing_skills)
+                }
+        
+        result_data = {
+            "extracted_skills": extracted_skills,
+            "missing_skills": missing_skills,
+            "weekly_tasks": weekly_tasks
+        }
+        await _cache_put(cache_key, result_data)
+        return result_data
+    
+    return await _single_flight(cache_key, analyze_gap)
 
 @app.post("/weekly_learning_task_generator")
 async def weekly_learning_task_generator(request: WeeklyLearningTaskRequest):
@@ -375,11 +530,7 @@ async def weekly_learning_task_generator(request: WeeklyLearningTaskRequest):
         resume_text = None
         
         if request.resume_id:
-            file_path = RESUMES_DIR / f"{request.resume_id}.txt"
-            if not file_path.exists():
-                raise HTTPException(status_code=404, detail="Resume not found")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                resume_text = f.read()
+            resume_text = _read_resume(request.resume_id)
         elif request.resume_text:
             resume_text = request.resume_text
         else:
@@ -395,82 +546,41 @@ async def weekly_learning_task_generator(request: WeeklyLearningTaskRequest):
             "weekly_tasks": []
         }
     
-    prompt = f"""Generate 5-7 practical weekly learning tasks for each missing skill. Return ONLY valid JSON.
-
-Missing Skills: {', '.join(missing_skills)}
-
-Return JSON:
-{{
-  "weekly_tasks": [
-    {{"skill": "skill1", "tasks": ["task1", "task2", "task3", "task4", "task5", "task6", "task7"]}},
-    {{"skill": "skill2", "tasks": ["task1", "task2", "task3", "task4", "task5"]}}
-  ]
-}}"""
+    cache_key = _cache_key("", "weekly_learning_task_generator", {"model": OLLAMA_MODEL, "missing_skills": missing_skills})
+    
+    async def generate_tasks() -> dict:
+        prompt = WEEKLY_TASKS_PROMPT.format(missing_skills=', '.join(missing_skills))
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.5,
-                        "num_predict": 1500
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Ollama service error")
-            
-            result = response.json()
-            analysis_text = result.get("response", "").strip()
-            
-            weekly_tasks = []
-            try:
-                first_brace = analysis_text.find('{')
-                last_brace = analysis_text.rfind('}')
-                
-                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                    json_str = analysis_text[first_brace:last_brace + 1]
-                else:
-                    json_str = analysis_text
-                
-                task_json = json.loads(json_str)
-                weekly_tasks = task_json.get("weekly_tasks", [])
-            except Exception:
-                pass
-            
-            if not weekly_tasks:
-                for skill in missing_skills:
-                    weekly_tasks.append({
-                        "skill": skill,
-                        "tasks": [
-                            f"Study {skill} fundamentals and core concepts",
-                            f"Complete online {skill} tutorial or course",
-                            f"Practice {skill} with hands-on exercises",
-                            f"Build a small project using {skill}",
-                            f"Read {skill} documentation and best practices",
-                            f"Join {skill} community and participate in discussions",
-                            f"Create a portfolio piece showcasing {skill}"
-                        ][:7]
-                    })
-            
-            return {
+        weekly_tasks = []
+        try:
+            tasks = await _ollama_generate_json(prompt, WeeklyTasks, num_predict=_task_num_predict(missing_skills), temperature=0.5)
+            weekly_tasks = tasks.model_dump()["weekly_tasks"]
+        except HTTPException as e:
+            if e.status_code != 502:
+                raise
+        
+        if weekly_tasks:
+            result_data = {
                 "extracted_skills": extracted_skills,
                 "missing_skills": missing_skills,
                 "weekly_tasks": weekly_tasks
             }
-    except httpx.TimeoutException:
-        raise HTTPException(status_code=504, detail="Request timeout. Ollama may be slow or unresponsive.")
-    except httpx.ConnectError:
-        raise HTTPException(status_code=503, detail="Cannot connect to Ollama service. Ensure Ollama is running at http://localhost:11434")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"Ollama connection error: {str(e)}")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+            await _cache_put(cache_key, result_data)
+            return result_data
+        
+        return {
+            "extracted_skills": extracted_skills,
+            "missing_skills": missing_skills,
+            "weekly_tasks": _fallback_tasks(missing_skills)
+        }
+    
+    return await _single_flight(cache_key, generate_tasks)
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:app",
+        workers=WEB_CONCURRENCY,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
 